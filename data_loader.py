@@ -23,23 +23,69 @@ Assumptions:
     sample_excels/fee_payments.xlsx
     sample_excels/teacher_salary_structure.xlsx
     sample_excels/teacher_payslips.xlsx
+  or, when none of those files exist, as same-named sheets of a single sample_excels/sample.xlsx workbook.
 
 The script inserts in the correct order, validates presence of required columns,
 and uses transactions. Adjust as needed for your exact Excel format.
 """
 
+import functools
+import importlib.util
+import io
 import os
 import sys
+import tempfile
 import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from openpyxl import load_workbook
+from sqlalchemy import Column, Integer, MetaData, Table, bindparam, column, create_engine, table, text
 from sqlalchemy.exc import SQLAlchemyError
 
 # ---------- CONFIG ----------
 DB_URL = "mysql+pymysql://root:@localhost/school_db"
 EXCEL_DIR = "sample_excels"
+SAMPLE_WORKBOOK = "sample.xlsx"  # combined workbook, one sheet per table; only read when there are no name.xlsx files
 LOGFILE = "data_loader.log"
+DATE_FORMAT = "%Y-%m-%d"
+
+# (sheet name, required columns) in FK insertion order; None = no column check
+SHEETS = [
+    ("schools", ["name"]),
+    ("grades", ["school_id","grade_name"]),
+    ("sections", ["grade_id","section_name"]),
+    ("subjects", ["school_id","subject_name"]),
+    ("teachers", ["school_id","name"]),
+    ("teacher_section_map", None),  # optional
+    ("students", ["school_id","name"]),
+    ("student_academic_map", None),  # optional
+    ("attendance", ["student_id","attendance_date","status"]),
+    ("class_diary", ["grade_id","section_id","subject_id","teacher_id","diary_date"]),
+    ("homework", ["school_id","grade_id","section_id","subject_id","teacher_id","homework_date","status"]),
+    ("timetable", ["school_id","grade_id","section_id","subject_id","teacher_id","day_of_week","period_number","period_type"]),
+    ("fees", ["student_id","fee_amount"]),
+    ("fee_payments", ["student_id","fee_structure_id","amount_paid","payment_date"]),
+    ("teacher_salary_structure", ["teacher_id","basic_pay"]),
+    ("teacher_payslips", ["teacher_id","month_year","gross_salary"]),
+]
+
+# Sheets no other table references -> target table. With PARALLEL_LEAF_INSERTS they are
+# loaded after the main transaction commits, concurrently on separate connections; this
+# gives up all-or-nothing loading, so it is off by default.
+LEAF_SHEETS = {
+    "attendance": "ss_t_attendance_register",
+    "class_diary": "ss_t_class_diary",
+    "homework": "ss_t_homework_details",
+    "timetable": "ss_t_class_timetable",
+    "teacher_salary_structure": "ss_t_teacher_salary_structure",
+    "teacher_payslips": "ss_t_teacher_salary_payslip",
+}
+PARALLEL_LEAF_INSERTS = False
+# ss_t_schools.name is not unique; set True to load same-named schools despite the pre-flight check
+ALLOW_DUPLICATE_SCHOOL_NAMES = False
 # ----------------------------
 
 logging.basicConfig(
@@ -48,20 +94,104 @@ logging.basicConfig(
     handlers=[logging.FileHandler(LOGFILE), logging.StreamHandler(sys.stdout)]
 )
 
-engine = create_engine(DB_URL, echo=False, future=True)
+# LOAD DATA LOCAL INFILE (bulk_copy) must be enabled client-side for pymysql
+connect_args = {"local_infile": True} if DB_URL.startswith("mysql") else {}
+engine = create_engine(DB_URL, echo=False, future=True, insertmanyvalues_page_size=1000, connect_args=connect_args)
 
 # ---------- Helpers ----------
-def read_sheet(name, required_cols=None):
-    path = os.path.join(EXCEL_DIR, f"{name}.xlsx")
-    if not os.path.exists(path):
-        logging.warning(f"Sheet {name}.xlsx not found in {EXCEL_DIR}.")
+def _cell(v):
+    """Normalise a raw cell: blank -> None, whole floats -> int."""
+    if v == "":
         return None
-    df = pd.read_excel(path, engine="openpyxl")
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+def _skip_empty_area(values):
+    """Drop the empty rows above and columns left of the data in openpyxl rows (None = blank),
+    as calamine's skip_empty_area does."""
+    top = next((i for i, r in enumerate(values) if any(v is not None for v in r)), len(values))
+    values = values[top:]
+    left = min((next(j for j, v in enumerate(r) if v is not None) for r in values if any(v is not None for v in r)),
+               default=0)
+    return [r[left:] for r in values]
+
+def use_sample_workbook():
+    """True when EXCEL_DIR has SAMPLE_WORKBOOK and no per-table name.xlsx files; the two are never mixed."""
+    if not os.path.exists(os.path.join(EXCEL_DIR, SAMPLE_WORKBOOK)):
+        return False
+    return not any(os.path.exists(os.path.join(EXCEL_DIR, f"{name}.xlsx")) for name, _ in SHEETS)
+
+def read_sheet_raw(name, required_cols=None, from_workbook=False):
+    """Read sheet name as (header, rows) with rows a list of tuples; None if it is missing.
+    Reads name.xlsx, or the sheet called name in SAMPLE_WORKBOOK when from_workbook."""
+    if from_workbook:
+        path, sheet = os.path.join(EXCEL_DIR, SAMPLE_WORKBOOK), name
+    else:
+        path, sheet = os.path.join(EXCEL_DIR, f"{name}.xlsx"), 0
+        if not os.path.exists(path):
+            logging.warning(f"Sheet {name}.xlsx not found in {EXCEL_DIR}.")
+            return None
+    try:
+        # calamine (Rust) hands back plain cell values, so no DataFrame is built at all
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        # read-only/values-only openpyxl streams rows and skips styles, formulas and links
+        wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+        try:
+            if sheet != 0 and sheet not in wb.sheetnames:
+                logging.warning(f"Sheet '{name}' not found in {path}.")
+                return None
+            ws = wb.worksheets[0] if sheet == 0 else wb[sheet]
+            # read-only mode trusts the sheet's <dimension> tag, which some writers leave as A1;
+            # reset it so every row is read (rows then come back ragged, padded below)
+            ws.reset_dimensions()
+            values = _skip_empty_area(list(ws.iter_rows(values_only=True)))
+        finally:
+            wb.close()
+        blank = None
+    else:
+        wb = CalamineWorkbook.from_path(path)
+        if sheet != 0 and sheet not in wb.sheet_names:
+            logging.warning(f"Sheet '{name}' not found in {path}.")
+            return None
+        ws = wb.get_sheet_by_index(0) if sheet == 0 else wb.get_sheet_by_name(sheet)
+        values = ws.to_python(skip_empty_area=True)
+        blank = ""
+    header = list(values[0]) if values else []
+    while header and header[-1] in (None, ""):  # trailing unused columns
+        header.pop()
+    header = [str(c) for c in header]
+    # blank test on the trimmed row, so a stray note right of the header doesn't keep a row
+    trimmed = (r[:len(header)] for r in values[1:])
+    rows = [tuple(_cell(v) for v in r) + (None,) * (len(header) - len(r)) for r in trimmed if any(v != blank for v in r)]
     if required_cols:
-        missing = [c for c in required_cols if c not in df.columns]
+        missing = [c for c in required_cols if c not in header]
         if missing:
             raise ValueError(f"{name}.xlsx is missing columns: {missing}")
-    return df
+    return header, rows
+
+def _read_one(name, required_cols=None, from_workbook=False):
+    """Worker entry point for read_sheets: returns (name, (header, rows))."""
+    return name, read_sheet_raw(name, required_cols, from_workbook)
+
+def read_sheets(sheets):
+    """Read (name, required_cols) sheets in parallel processes. Returns {name: (header, rows)}."""
+    if use_sample_workbook():
+        # a single file: parallel processes would only re-open the same workbook
+        logging.info(f"No per-table .xlsx files — reading every sheet from {os.path.join(EXCEL_DIR, SAMPLE_WORKBOOK)}")
+        return dict(_read_one(name, cols, True) for name, cols in sheets)
+    logging.info(f"Reading per-table .xlsx files from {EXCEL_DIR}")
+    if os.path.exists(os.path.join(EXCEL_DIR, SAMPLE_WORKBOOK)):
+        logging.info(f"Ignoring {SAMPLE_WORKBOOK}: it is only read when there are no per-table files")
+    # xlsx parsing is CPU-bound, so one process per file; not worth it for a single file
+    present = [f for f in os.listdir(EXCEL_DIR) if f.endswith(".xlsx")]
+    if len(present) <= 1:
+        return dict(_read_one(name, cols) for name, cols in sheets)
+    names, cols = zip(*sheets)
+    workers = min(len(sheets), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_read_one, names, cols))
 
 def ensure_dir():
     os.makedirs(EXCEL_DIR, exist_ok=True)
@@ -69,6 +199,7 @@ def ensure_dir():
 def create_sample_excels():
     """Create minimal sample excel files so user can fill/see formats."""
     ensure_dir()
+    today = datetime.today().date()
     samples = {
         "schools": pd.DataFrame([{"name":"Demo School","type":"Private","contact_details":"9999999999","location":"Mumbai"}]),
         "grades": pd.DataFrame([{"school_id":1,"grade_name":"Grade 6","display_order":1},
@@ -80,259 +211,497 @@ def create_sample_excels():
                                   {"school_id":1,"name":"Teacher B","contact_info":"222","gender":"F","qualification":"MEd"}]),
         "students": pd.DataFrame([{"school_id":1,"name":"Student 1","dob":"2012-01-01","gender":"M"}]),
         "student_academic_map": pd.DataFrame([{"student_id":1,"grade_id":1,"section_id":1,"academic_year":"2024-25"}]),
-        "attendance": pd.DataFrame([{"student_id":1,"attendance_date":datetime.today().date(),"status":"Present"}]),
-        "class_diary": pd.DataFrame([{"grade_id":1,"section_id":1,"subject_id":1,"teacher_id":1,"diary_date":datetime.today().date(),"activity":"Intro"}]),
-        "homework": pd.DataFrame([{"school_id":1,"grade_id":1,"section_id":1,"subject_id":1,"teacher_id":1,"homework_date":datetime.today().date(),"status":"Pending","description":"Solve Q1"}]),
+        "attendance": pd.DataFrame([{"student_id":1,"attendance_date":today,"status":"Present"}]),
+        "class_diary": pd.DataFrame([{"grade_id":1,"section_id":1,"subject_id":1,"teacher_id":1,"diary_date":today,"activity":"Intro"}]),
+        "homework": pd.DataFrame([{"school_id":1,"grade_id":1,"section_id":1,"subject_id":1,"teacher_id":1,"homework_date":today,"status":"Pending","description":"Solve Q1"}]),
         "timetable": pd.DataFrame([{"school_id":1,"grade_id":1,"section_id":1,"subject_id":1,"teacher_id":1,"day_of_week":"Monday","period_number":1,"period_type":"Class"}]),
         "fees": pd.DataFrame([{"student_id":1,"fee_amount":1000.0}]),
-        "fee_payments": pd.DataFrame([{"student_id":1,"fee_structure_id":1,"amount_paid":500.0,"payment_date":datetime.today().date(),"payment_method":"Online"}]),
+        "fee_payments": pd.DataFrame([{"student_id":1,"fee_structure_id":1,"amount_paid":500.0,"payment_date":today,"payment_method":"Online"}]),
         "teacher_salary_structure": pd.DataFrame([{"teacher_id":1,"basic_pay":30000.0,"hra":5000.0,"other_allowances":2000.0}]),
         "teacher_payslips": pd.DataFrame([{"teacher_id":1,"month_year":"2025-06","gross_salary":37000.0,"deductions":2000.0,"net_salary":35000.0}])
     }
-    for name, df in samples.items():
-        path = os.path.join(EXCEL_DIR, f"{name}.xlsx")
-        df.to_excel(path, index=False)
-        logging.info(f"Created sample {path}")
+    # one workbook, one sheet per table; xlsxwriter is much faster than openpyxl if installed
+    excel_engine = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+    path = os.path.join(EXCEL_DIR, SAMPLE_WORKBOOK)
+    with pd.ExcelWriter(path, engine=excel_engine) as writer:
+        for name, df in samples.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    logging.info(f"Created sample {path} with sheets: {', '.join(samples)}")
 
 # ---------- Insert functions ----------
-def insert_table_from_df(conn, df, table_name, cols=None):
-    """Insert rows from df into table_name. Returns number of rows inserted."""
-    if df is None or df.empty:
+# positional placeholder per DBAPI paramstyle
+PLACEHOLDERS = {"format": "%s", "pyformat": "%s", "qmark": "?"}
+
+@functools.lru_cache(maxsize=64)
+def _positional_insert(table_name, cols, paramstyle):
+    """INSERT string with positional placeholders, built once per (table, cols)."""
+    placeholders = ", ".join([PLACEHOLDERS[paramstyle]] * len(cols))
+    return f"INSERT INTO {table_name} ({', '.join(cols)}) VALUES ({placeholders})"
+
+@functools.lru_cache(maxsize=64)
+def _insert_stmt(table_name, cols):
+    """Core insert() over untyped columns, built once per (table, cols)."""
+    return table(table_name, *[column(c) for c in cols]).insert()
+
+def insert_rows(conn, sheet, table_name, batch_size=5000):
+    """Insert a (header, rows) sheet into table_name in batches. Returns number of rows inserted."""
+    if sheet is None or not sheet[1]:
         logging.info(f"No data to insert for {table_name}.")
         return 0
-    # Use parameterized insert with text()
-    cols = cols or list(df.columns)
-    col_list = ", ".join(cols)
-    placeholders = ", ".join([f":{c}" for c in cols])
-    stmt = text(f"INSERT INTO {table_name} ({col_list}) VALUES ({placeholders})")
-    rows = df[cols].to_dict(orient="records")
-    conn.execute(stmt, rows)
+    header, rows = sheet
+    stmt = _positional_insert(table_name, tuple(header), conn.dialect.paramstyle)
+    # rows are already positional tuples, so they go straight to the driver
+    for start in range(0, len(rows), batch_size):
+        conn.exec_driver_sql(stmt, rows[start:start + batch_size])
+    return len(rows)
+
+def insert_records(conn, table_name, rows):
+    """Executemany rows (list of dicts) into table_name. Returns number of rows inserted."""
+    if not rows:
+        return 0
+    # A Core insert() keeps VALUES to bare placeholders, which lets the driver
+    # batch the executemany into multi-row INSERTs (pymysql) / insertmanyvalues.
+    # Columns are untyped so values bind exactly as with text(); created_at and
+    # updated_at are left to the column defaults.
+    conn.execute(_insert_stmt(table_name, tuple(rows[0])), rows)
     return len(rows)
 
-def fetch_one(conn, query, params=None):
-    res = conn.execute(text(query), params or {})
-    return res.fetchone()
+@functools.lru_cache(maxsize=64)
+def _returning_insert(table_name, cols, id_col):
+    """insert() ... RETURNING id_col; insertmanyvalues needs a real Table with the
+    integer primary key declared, a bare table() fails as soon as there are 2+ rows."""
+    tbl = Table(table_name, MetaData(), Column(id_col, Integer, primary_key=True), *[Column(c) for c in cols])
+    return tbl.insert().returning(tbl.c[id_col])
+
+def insert_returning_ids(conn, table_name, rows, id_col, batch_size=5000):
+    """Insert rows (list of dicts) into table_name and return their generated id_col values."""
+    if not conn.dialect.insert_returning and rows:
+        # MySQL has no RETURNING: a single multi-row INSERT gets ids starting at
+        # LAST_INSERT_ID(), spaced by auto_increment_increment (not 1 under replication setups)
+        step = conn.execute(text("SELECT @@auto_increment_increment")).scalar()
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if conn.dialect.insert_returning:
+            batch_ids = conn.execute(_returning_insert(table_name, tuple(batch[0]), id_col), batch).scalars().all()
+        else:
+            inserted = conn.execute(_insert_stmt(table_name, tuple(batch[0])).values(batch)).rowcount
+            if inserted != len(batch):
+                raise RuntimeError(f"{table_name}: inserted {inserted} of {len(batch)} rows, cannot derive their ids")
+            first = conn.execute(text("SELECT LAST_INSERT_ID()")).scalar()
+            batch_ids = list(range(first, first + step * len(batch), step))
+        ids.extend(batch_ids)
+    return ids
+
+# MySQL errors meaning LOAD DATA LOCAL INFILE is disabled (server local_infile=OFF / client side)
+LOCAL_INFILE_DISABLED = (1148, 3948)
+_local_infile_ok = True
+
+def _insert_frame(conn, df, table_name, cols):
+    """insert_records() fallback for bulk_copy."""
+    # only slice (and copy) when cols is a strict subset/reordering
+    target = df if list(df.columns) == list(cols) else df[cols]
+    # hand the driver native date objects rather than ISO strings
+    date_cols = target.select_dtypes(include=["datetime"]).columns
+    if len(date_cols):
+        target = target.assign(**{c: target[c].dt.date for c in date_cols})
+    return insert_records(conn, table_name, target.to_dict(orient="records"))
+
+def bulk_copy(conn, df, table_name, cols):
+    """Bulk-load df's cols via LOAD DATA (MySQL) / COPY (Postgres). Returns number of rows inserted."""
+    global _local_infile_ok
+    # datetime64 columns are rendered to ISO dates by to_csv in one vectorized pass,
+    # so neither side converts dates row by row
+    dialect = conn.dialect.name
+    col_list = ", ".join(cols)
+    if dialect == "postgresql":
+        buf = io.StringIO()
+        df.to_csv(buf, columns=cols, index=False, header=False, date_format=DATE_FORMAT, lineterminator="\n")
+        buf.seek(0)
+        with conn.connection.cursor() as cur:
+            cur.copy_expert(f"COPY {table_name} ({col_list}) FROM STDIN WITH CSV", buf)
+    elif dialect == "mysql" and _local_infile_ok:
+        # pymysql streams LOCAL INFILE from a path, so spool the CSV to a temp file; \N = NULL
+        f = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8")
+        try:
+            with f:
+                df.to_csv(f, columns=cols, index=False, header=False, date_format=DATE_FORMAT, na_rep="\\N", lineterminator="\n")
+            with conn.connection.cursor() as cur:
+                cur.execute(f"""LOAD DATA LOCAL INFILE %s INTO TABLE {table_name} CHARACTER SET utf8mb4
+                                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' LINES TERMINATED BY '\\n'
+                                ({col_list})""", (f.name,))
+                # LOCAL implies IGNORE: rows failing FK/enum/conversion checks are skipped
+                # with only a warning, so a short count is the one sign of lost rows
+                loaded = cur.rowcount
+                if loaded != len(df):
+                    cur.execute("SHOW WARNINGS LIMIT 5")
+                    reasons = [w[2] for w in cur.fetchall()]
+                    raise RuntimeError(f"LOAD DATA into {table_name} loaded {loaded} of {len(df)} rows: {reasons}")
+        except conn.dialect.loaded_dbapi.OperationalError as e:
+            if e.args[0] not in LOCAL_INFILE_DISABLED:
+                raise
+            # a failed statement does not abort the InnoDB transaction, so carry on with INSERTs
+            logging.warning(f"LOAD DATA LOCAL INFILE is disabled on this server ({e.args[-1]}); using batched INSERTs")
+            _local_infile_ok = False
+            return _insert_frame(conn, df, table_name, cols)
+        finally:
+            os.remove(f.name)
+        return loaded
+    else:
+        return _insert_frame(conn, df, table_name, cols)
+    # COPY is all-or-nothing: any bad row raises and aborts the transaction
+    return len(df)
+
+def load_leaf_sheets(leaf_sheets):
+    """Insert {table_name: sheet} concurrently, one connection and transaction per table.
+    Every table is allowed to finish; the first failure is re-raised after logging what committed."""
+    def load(table_name, sheet):
+        with engine.begin() as conn:
+            return insert_rows(conn, sheet, table_name)
+    committed, failed = [], {}
+    # DB round-trips release the GIL, so threads are enough to overlap them
+    with ThreadPoolExecutor(max_workers=len(leaf_sheets)) as executor:
+        futures = {executor.submit(load, table_name, sheet): table_name for table_name, sheet in leaf_sheets.items()}
+        for future in as_completed(futures):
+            table_name = futures[future]
+            try:
+                inserted = future.result()
+            except Exception as e:
+                failed[table_name] = e
+                logging.error(f"Parallel leaf load of {table_name} failed and was rolled back: {e}")
+            else:
+                committed.append(table_name)
+                logging.info(f"Inserted {inserted} rows into {table_name} (parallel leaf load)")
+    if failed:
+        logging.error(f"Parallel leaf load incomplete — committed: {sorted(committed) or 'none'}; "
+                      f"rolled back: {sorted(failed)}")
+        raise next(iter(failed.values()))
+
+def iter_ids(conn, table_name, id_col, batch_size=5000):
+    """Yield ascending lists of id_col values from table_name, batch_size at a time."""
+    # keyset pagination rather than stream_results: a MySQL unbuffered cursor blocks
+    # the connection, and the caller inserts on it between batches
+    last = 0
+    while True:
+        ids = conn.execute(text(f"SELECT {id_col} FROM {table_name} WHERE {id_col} > :last ORDER BY {id_col} LIMIT :n"),
+                           {"last": last, "n": batch_size}).scalars().all()
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+def load_lookup(conn, table_name, key_col):
+    """SELECT * from table_name into {key: Row}, ordered by key."""
+    rows = conn.execute(text(f"SELECT * FROM {table_name} ORDER BY {key_col}"))
+    return {getattr(r, key_col): r for r in rows}
+
+def preflight_check(sheets):
+    """Read-only checks run before the write transaction opens. Returns a list of problems."""
+    problems = []
+    sheet = sheets["schools"]
+    if sheet is None or not sheet[1]:
+        return problems
+    header, rows = sheet
+    names = [r[header.index("name")] for r in rows]
+    # key=str: a blank (None) or numeric name must not break sorting
+    dupes = sorted((n for n, k in Counter(names).items() if k > 1), key=str)
+    if dupes:
+        problems.append(f"schools.xlsx lists these schools more than once: {dupes}")
+    # autocommit: the probe holds no transaction open
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as ro:
+        stmt = text("SELECT name FROM ss_t_schools WHERE name IN :names").bindparams(bindparam("names", expanding=True))
+        existing = ro.execute(stmt, {"names": names}).scalars().all()
+    if existing:
+        problems.append(f"Schools already loaded (re-run would duplicate data): {sorted(existing, key=str)}")
+    return problems
+
+# ---------- Auto-generated rows ----------
+def build_teacher_section_rows(teachers, sections, subjects):
+    """Round-robin 2 sections to each teacher, with an arbitrary (lowest id) subject of the teacher's school."""
+    if not sections:
+        return []
+    subj_by_school = {}
+    for subject_id, subj in subjects.items():
+        subj_by_school.setdefault(subj.school_id, subject_id)
+    sec_ids = np.fromiter(sections, dtype=np.int64)
+    sec_grades = np.array([s.grade_id for s in sections.values()], dtype=np.int64)
+    # slot k of the round robin gets section k mod n_sections; no per-assignment loop
+    pick = np.arange(len(teachers) * 2) % len(sec_ids)
+    df = pd.DataFrame({
+        "teacher_id": np.repeat(list(teachers), 2),
+        "grade_id": sec_grades[pick],
+        "section_id": sec_ids[pick],
+        "subject_id": np.repeat([subj_by_school.get(t.school_id) for t in teachers.values()], 2),
+    })
+    return df.to_dict(orient="records")
+
+def build_academic_map_rows(student_ids, sections, offset=0):
+    """Fill sections 10 students at a time, wrapping round; offset = students already placed."""
+    if not sections:
+        return []
+    sec_ids = np.fromiter(sections, dtype=np.int64)
+    sec_grades = np.array([s.grade_id for s in sections.values()], dtype=np.int64)
+    pick = (np.arange(offset, offset + len(student_ids)) // 10) % len(sec_ids)
+    df = pd.DataFrame({
+        "student_id": student_ids,
+        "grade_id": sec_grades[pick],
+        "section_id": sec_ids[pick],
+        "academic_year": "2024-25",
+    })
+    return df.to_dict(orient="records")
+
+def _cross(teachers, name, values):
+    """DataFrame with one row per (teacher_id, value) pair."""
+    idx = pd.MultiIndex.from_product([list(teachers), values], names=["teacher_id", name])
+    return idx.to_frame(index=False)
+
+def build_diary_rows(teachers, today):
+    """2 diary entries per teacher (assignment requirement)."""
+    df = _cross(teachers, "activity", ["Activity 1", "Activity 2"])
+    df = df.assign(grade_id=1, section_id=1, subject_id=1, diary_date=today)
+    return df.to_dict(orient="records")
+
+def build_homework_rows(teachers, today):
+    """3 homework entries per teacher, one per status."""
+    df = _cross(teachers, "status", ["Pending", "Submitted", "Completed"])
+    df = df.assign(school_id=1, grade_id=1, section_id=1, subject_id=1, homework_date=today,
+                   description=lambda d: "HW " + d.status)
+    return df.to_dict(orient="records")
+
+def build_timetable_rows():
+    """A single class period for demonstration."""
+    return [{"school_id":1,"grade_id":1,"section_id":1,"subject_id":1,"teacher_id":1,"day_of_week":"Monday","period_number":1,"period_type":"Class"}]
+
+def build_payslip_rows(teachers):
+    """June and July payslips for each teacher."""
+    df = _cross(teachers, "month_year", ["2025-06", "2025-07"])
+    df = df.assign(gross_salary=35000.0, deductions=2000.0, net_salary=33000.0)
+    return df.to_dict(orient="records")
 
 # ---------- High-level loader ----------
 def run_loader():
     ensure_dir()
+    today = datetime.today().date()  # one date for every generated row in this run
     # if directory empty - create sample excels
     if not os.listdir(EXCEL_DIR):
         logging.info(f"{EXCEL_DIR} empty — creating sample excel templates.")
         create_sample_excels()
-        logging.info("Fill sample_excels/*.xlsx with your data and re-run the script.")
+        logging.info(f"Fill {EXCEL_DIR}/{SAMPLE_WORKBOOK} (or per-table .xlsx files) with your data and re-run the script.")
         return
 
     # Read sheets (non-fatal if some optional sheets missing)
     try:
-        df_schools = read_sheet("schools", required_cols=["name"])
-        df_grades = read_sheet("grades", required_cols=["school_id","grade_name"])
-        df_sections = read_sheet("sections", required_cols=["grade_id","section_name"])
-        df_subjects = read_sheet("subjects", required_cols=["school_id","subject_name"])
-        df_teachers = read_sheet("teachers", required_cols=["school_id","name"])
-        df_teacher_section_map = read_sheet("teacher_section_map")  # optional
-        df_students = read_sheet("students", required_cols=["school_id","name"])
-        df_student_academic_map = read_sheet("student_academic_map")  # optional
-        df_attendance = read_sheet("attendance", required_cols=["student_id","attendance_date","status"])
-        df_class_diary = read_sheet("class_diary", required_cols=["grade_id","section_id","subject_id","teacher_id","diary_date"])
-        df_homework = read_sheet("homework", required_cols=["school_id","grade_id","section_id","subject_id","teacher_id","homework_date","status"])
-        df_timetable = read_sheet("timetable", required_cols=["school_id","grade_id","section_id","subject_id","teacher_id","day_of_week","period_number","period_type"])
-        df_fees = read_sheet("fees", required_cols=["student_id","fee_amount"])
-        df_fee_payments = read_sheet("fee_payments", required_cols=["student_id","fee_structure_id","amount_paid","payment_date"])
-        df_teacher_salary = read_sheet("teacher_salary_structure", required_cols=["teacher_id","basic_pay"])
-        df_payslips = read_sheet("teacher_payslips", required_cols=["teacher_id","month_year","gross_salary"])
+        sheets = read_sheets(SHEETS)
     except Exception as e:
         logging.exception("Error reading excel sheets: %s", e)
         return
+    sheet_schools = sheets["schools"]
+    sheet_grades = sheets["grades"]
+    sheet_sections = sheets["sections"]
+    sheet_subjects = sheets["subjects"]
+    sheet_teachers = sheets["teachers"]
+    sheet_teacher_section_map = sheets["teacher_section_map"]
+    sheet_students = sheets["students"]
+    sheet_student_academic_map = sheets["student_academic_map"]
+    sheet_attendance = sheets["attendance"]
+    sheet_class_diary = sheets["class_diary"]
+    sheet_homework = sheets["homework"]
+    sheet_timetable = sheets["timetable"]
+    sheet_fees = sheets["fees"]
+    sheet_fee_payments = sheets["fee_payments"]
+    sheet_teacher_salary = sheets["teacher_salary_structure"]
+    sheet_payslips = sheets["teacher_payslips"]
+
+    # Opt-in: leaf sheets are loaded after the main transaction commits, concurrently
+    deferred = {}
+    if PARALLEL_LEAF_INSERTS:
+        deferred = {table_name: sheets[name] for name, table_name in LEAF_SHEETS.items() if sheets[name] is not None}
+
+    # (table_name, rows, log label) built by the auto branches, inserted together at the end
+    auto_rows = []
 
     # Begin DB transaction and inserts
     try:
+        problems = preflight_check(sheets)
+        if problems and ALLOW_DUPLICATE_SCHOOL_NAMES:
+            for p in problems:
+                logging.warning(p)
+            logging.warning("ALLOW_DUPLICATE_SCHOOL_NAMES is set — loading anyway.")
+        elif problems:
+            for p in problems:
+                logging.error(p)
+            logging.error("Pre-flight check failed — nothing was loaded. "
+                          "Set ALLOW_DUPLICATE_SCHOOL_NAMES = True if same-named schools are intended.")
+            return
+
         with engine.begin() as conn:  # transaction
             # Order of insertion to satisfy FKs
-            if df_schools is not None:
-                inserted = insert_table_from_df(conn, df_schools, "ss_t_schools")
+            if sheet_schools is not None:
+                inserted = insert_rows(conn, sheet_schools, "ss_t_schools")
                 logging.info(f"Inserted {inserted} schools")
 
-            if df_grades is not None:
-                inserted = insert_table_from_df(conn, df_grades, "ss_t_grade")
+            if sheet_grades is not None:
+                inserted = insert_rows(conn, sheet_grades, "ss_t_grade")
                 logging.info(f"Inserted {inserted} grades")
 
-            if df_sections is not None:
-                inserted = insert_table_from_df(conn, df_sections, "ss_t_section")
+            if sheet_sections is not None:
+                inserted = insert_rows(conn, sheet_sections, "ss_t_section")
                 logging.info(f"Inserted {inserted} sections")
 
-            if df_subjects is not None:
-                inserted = insert_table_from_df(conn, df_subjects, "ss_t_subject")
+            if sheet_subjects is not None:
+                inserted = insert_rows(conn, sheet_subjects, "ss_t_subject")
                 logging.info(f"Inserted {inserted} subjects")
 
-            if df_teachers is not None:
-                inserted = insert_table_from_df(conn, df_teachers, "ss_t_teacher")
+            if sheet_teachers is not None:
+                inserted = insert_rows(conn, sheet_teachers, "ss_t_teacher")
                 logging.info(f"Inserted {inserted} teachers")
 
+            # Reference data is complete from here on: fetch it once for all auto-map branches
+            sections = load_lookup(conn, "ss_t_section", "section_id")
+            subjects = load_lookup(conn, "ss_t_subject", "subject_id")
+            teachers = load_lookup(conn, "ss_t_teacher", "teacher_id")
+
             # If teacher_section_map provided insert, else attempt to auto-map teachers to sections (basic)
-            if df_teacher_section_map is not None:
-                inserted = insert_table_from_df(conn, df_teacher_section_map, "ss_t_teacher_section_map")
+            if sheet_teacher_section_map is not None:
+                inserted = insert_rows(conn, sheet_teacher_section_map, "ss_t_teacher_section_map")
                 logging.info(f"Inserted {inserted} teacher_section_map rows")
             else:
                 # OPTIONAL: auto-assign each teacher to first 2 sections (if sections exist)
                 logging.info("No teacher_section_map.xlsx found — attempting auto-assignment (2 sections per teacher)")
-                sections = conn.execute(text("SELECT section_id, grade_id FROM ss_t_section ORDER BY section_id")).fetchall()
-                teachers = conn.execute(text("SELECT teacher_id, school_id FROM ss_t_teacher ORDER BY teacher_id")).fetchall()
-                # simple algorithm: round-robin assign 2 sections to each teacher
-                assignments = []
-                sec_ids = [s.section_id for s in sections]
-                if sec_ids:
-                    idx = 0
-                    for t in teachers:
-                        for _ in range(2):
-                            sid = sec_ids[idx % len(sec_ids)]
-                            # need grade_id for mapping
-                            grade_id = conn.execute(text("SELECT grade_id FROM ss_t_section WHERE section_id = :sid"), {"sid": sid}).scalar()
-                            # pick a subject for the school arbitrarily
-                            subject_id = conn.execute(text("SELECT subject_id FROM ss_t_subject WHERE school_id = :s"), {"s": t.school_id}).scalar()
-                            assignments.append({"teacher_id": t.teacher_id, "grade_id": grade_id, "section_id": sid, "subject_id": subject_id})
-                            idx += 1
-                    if assignments:
-                        conn.execute(text("""INSERT INTO ss_t_teacher_section_map (teacher_id, grade_id, section_id, subject_id, created_at, updated_at)
-                                              VALUES (:teacher_id, :grade_id, :section_id, :subject_id, NOW(), NOW())"""), assignments)
-                        logging.info(f"Auto-assigned {len(assignments)} teacher-section mappings")
+                assignments = build_teacher_section_rows(teachers, sections, subjects)
+                if assignments:
+                    insert_records(conn, "ss_t_teacher_section_map", assignments)
+                    logging.info(f"Auto-assigned {len(assignments)} teacher-section mappings")
 
             # STUDENTS
-            if df_students is not None:
-                inserted = insert_table_from_df(conn, df_students, "ss_t_student")
+            if sheet_students is not None:
+                inserted = insert_rows(conn, sheet_students, "ss_t_student")
                 logging.info(f"Inserted {inserted} students")
 
             # STUDENT ACADEMIC MAP: if not provided, auto-map students evenly into sections
-            if df_student_academic_map is not None:
-                inserted = insert_table_from_df(conn, df_student_academic_map, "ss_t_student_academic_map")
+            if sheet_student_academic_map is not None:
+                inserted = insert_rows(conn, sheet_student_academic_map, "ss_t_student_academic_map")
                 logging.info(f"Inserted {inserted} student_academic_map rows")
             else:
                 logging.info("No student_academic_map.xlsx — auto-mapping students to sections (10 per section target)")
-                students = conn.execute(text("SELECT student_id FROM ss_t_student ORDER BY student_id")).fetchall()
-                sections = conn.execute(text("SELECT section_id, grade_id FROM ss_t_section ORDER BY section_id")).fetchall()
-                records = []
-                sec_idx = 0
-                for i, s in enumerate(students):
-                    sec = sections[sec_idx % len(sections)]
-                    records.append({"student_id": s.student_id, "grade_id": sec.grade_id, "section_id": sec.section_id, "academic_year":"2024-25"})
-                    # aim for 10 per section then move to next
-                    if (i+1) % 10 == 0:
-                        sec_idx += 1
-                if records:
-                    conn.execute(text("""INSERT INTO ss_t_student_academic_map (student_id, grade_id, section_id, academic_year, created_at, updated_at)
-                                         VALUES (:student_id, :grade_id, :section_id, :academic_year, NOW(), NOW())"""), records)
-                    logging.info(f"Auto-inserted {len(records)} student academic mappings")
+                inserted = 0
+                for student_ids in iter_ids(conn, "ss_t_student", "student_id"):
+                    records = build_academic_map_rows(student_ids, sections, offset=inserted)
+                    inserted += insert_records(conn, "ss_t_student_academic_map", records)
+                if inserted:
+                    logging.info(f"Auto-inserted {inserted} student academic mappings")
 
             # ATTENDANCE - must ensure >= 80% attendance overall (business rule)
-            if df_attendance is not None:
-                inserted = insert_table_from_df(conn, df_attendance, "ss_t_attendance_register")
+            if "ss_t_attendance_register" in deferred:
+                logging.info("Deferred ss_t_attendance_register to the parallel leaf load")
+            elif sheet_attendance is not None:
+                inserted = insert_rows(conn, sheet_attendance, "ss_t_attendance_register")
                 logging.info(f"Inserted {inserted} attendance records")
             else:
                 # Optionally generate attendance to satisfy >=80% for the month for all students
                 logging.info("No attendance.xlsx — creating synthetic attendance with >=80% present for current month")
-                students = conn.execute(text("SELECT student_id FROM ss_t_student")).fetchall()
-                today = datetime.today()
                 # example: generate 20 school days for month start
                 dates = pd.date_range(start=today.replace(day=1), periods=20, freq='B')  # business days
-                records = []
-                for s in students:
-                    for d in dates:
-                        status = "Present" if (pd.np.random.rand() <= 0.85) else "Absent"  # ~85% present
-                        records.append({"student_id": s.student_id, "attendance_date": d.date(), "status": status, "remarks": None})
-                if records:
-                    conn.execute(text("""INSERT INTO ss_t_attendance_register (student_id, attendance_date, status, remarks, created_at, updated_at)
-                                         VALUES (:student_id, :attendance_date, :status, :remarks, NOW(), NOW())"""), records)
-                    logging.info(f"Inserted synthetic {len(records)} attendance records")
+                rng = np.random.default_rng()
+                labels = np.array(["Absent", "Present"])
+                inserted = 0
+                for student_ids in iter_ids(conn, "ss_t_student", "student_id"):
+                    # build students x dates in one shot instead of a per-row python loop
+                    n, d = len(student_ids), len(dates)
+                    # uint8 draws in 0..99 are 1/8 the size of float64; < 85 -> 85% present
+                    present = rng.integers(0, 100, size=n * d, dtype=np.uint8) < 85
+                    df_synth = pd.DataFrame({
+                        "student_id": np.repeat(student_ids, d),
+                        "attendance_date": np.tile(dates.values, n),  # datetime64, formatted once by bulk_copy
+                        "status": labels[present.astype(np.uint8)],
+                        "remarks": None,
+                    })
+                    inserted += bulk_copy(conn, df_synth, "ss_t_attendance_register", list(df_synth.columns))
+                if inserted:
+                    logging.info(f"Inserted synthetic {inserted} attendance records")
 
             # CLASS DIARY
-            if df_class_diary is not None:
-                inserted = insert_table_from_df(conn, df_class_diary, "ss_t_class_diary")
+            if "ss_t_class_diary" in deferred:
+                logging.info("Deferred ss_t_class_diary to the parallel leaf load")
+            elif sheet_class_diary is not None:
+                inserted = insert_rows(conn, sheet_class_diary, "ss_t_class_diary")
                 logging.info(f"Inserted {inserted} class diary rows")
             else:
                 logging.info("No class_diary.xlsx — creating 2 diary entries per teacher (assignment requirement)")
-                teachers = conn.execute(text("SELECT teacher_id FROM ss_t_teacher")).fetchall()
-                diary_rows = []
-                for t in teachers:
-                    diary_rows.append({"grade_id": 1, "section_id": 1, "subject_id": 1, "teacher_id": t.teacher_id, "diary_date": datetime.today().date(), "activity":"Activity 1"})
-                    diary_rows.append({"grade_id": 1, "section_id": 1, "subject_id": 1, "teacher_id": t.teacher_id, "diary_date": datetime.today().date(), "activity":"Activity 2"})
-                conn.execute(text("""INSERT INTO ss_t_class_diary (grade_id, section_id, subject_id, teacher_id, diary_date, activity, created_at, updated_at)
-                                     VALUES (:grade_id, :section_id, :subject_id, :teacher_id, :diary_date, :activity, NOW(), NOW())"""), diary_rows)
-                logging.info(f"Inserted {len(diary_rows)} auto diary entries")
+                auto_rows.append(("ss_t_class_diary", build_diary_rows(teachers, today), "auto diary entries"))
 
             # HOMEWORK - ensure 3 per teacher in statuses: Pending, Submitted, Completed
-            if df_homework is not None:
-                inserted = insert_table_from_df(conn, df_homework, "ss_t_homework_details")
+            if "ss_t_homework_details" in deferred:
+                logging.info("Deferred ss_t_homework_details to the parallel leaf load")
+            elif sheet_homework is not None:
+                inserted = insert_rows(conn, sheet_homework, "ss_t_homework_details")
                 logging.info(f"Inserted {inserted} homework rows")
             else:
                 logging.info("No homework.xlsx — creating 3 homework entries per teacher (Pending/Submitted/Completed)")
-                teachers = conn.execute(text("SELECT teacher_id FROM ss_t_teacher")).fetchall()
-                hw_rows = []
-                statuses = ["Pending", "Submitted", "Completed"]
-                for t in teachers:
-                    for s in statuses:
-                        hw_rows.append({"school_id":1,"grade_id":1,"section_id":1,"subject_id":1,"teacher_id":t.teacher_id,"homework_date":datetime.today().date(),"status":s,"description":f"HW {s}"})
-                conn.execute(text("""INSERT INTO ss_t_homework_details (school_id, grade_id, section_id, subject_id, teacher_id, homework_date, status, description, created_at, updated_at)
-                                     VALUES (:school_id, :grade_id, :section_id, :subject_id, :teacher_id, :homework_date, :status, :description, NOW(), NOW())"""), hw_rows)
-                logging.info(f"Inserted {len(hw_rows)} auto homework rows")
+                auto_rows.append(("ss_t_homework_details", build_homework_rows(teachers, today), "auto homework rows"))
 
             # TIMETABLE
-            if df_timetable is not None:
-                inserted = insert_table_from_df(conn, df_timetable, "ss_t_class_timetable")
+            if "ss_t_class_timetable" in deferred:
+                logging.info("Deferred ss_t_class_timetable to the parallel leaf load")
+            elif sheet_timetable is not None:
+                inserted = insert_rows(conn, sheet_timetable, "ss_t_class_timetable")
                 logging.info(f"Inserted {inserted} timetable rows")
             else:
                 logging.info("No timetable.xlsx — creating minimal timetable entries")
-                # create a single class period for demonstration
-                conn.execute(text("""INSERT INTO ss_t_class_timetable (school_id, grade_id, section_id, subject_id, teacher_id, day_of_week, period_number, period_type, created_at, updated_at)
-                                     VALUES (1,1,1,1,1,'Monday',1,'Class',NOW(),NOW())"""))
-                logging.info("Inserted 1 timetable row")
+                auto_rows.append(("ss_t_class_timetable", build_timetable_rows(), "timetable rows"))
 
             # FEES -> fee_structure and payments -> school_income
-            if df_fees is not None:
-                insert_table_from_df(conn, df_fees, "ss_t_student_fee_structure")
+            if sheet_fees is not None:
+                insert_rows(conn, sheet_fees, "ss_t_student_fee_structure")
                 logging.info("Inserted fee structures")
-            if df_fee_payments is not None:
-                insert_table_from_df(conn, df_fee_payments, "ss_t_fee_payment_installment")
-                logging.info("Inserted fee payments")
-                # propagate to school income
-                payments = conn.execute(text("SELECT fee_payment_id FROM ss_t_fee_payment_installment ORDER BY fee_payment_id")).fetchall()
-                income_rows = [{"fee_payment_id": p.fee_payment_id} for p in payments]
+            if sheet_fee_payments is not None:
+                header, rows = sheet_fee_payments
+                # propagate only the payments inserted here (not earlier ones) to school income
+                payment_ids = insert_returning_ids(conn, "ss_t_fee_payment_installment", [dict(zip(header, r)) for r in rows], "fee_payment_id")
+                logging.info(f"Inserted {len(payment_ids)} fee payments")
+                income_rows = [{"fee_payment_id": p} for p in payment_ids]
                 if income_rows:
-                    conn.execute(text("""INSERT INTO ss_t_school_income (fee_payment_id, created_at, updated_at) VALUES (:fee_payment_id, NOW(), NOW())"""), income_rows)
+                    insert_records(conn, "ss_t_school_income", income_rows)
                     logging.info(f"Inserted {len(income_rows)} school income rows")
             else:
                 logging.info("No fee_payments.xlsx — creating one payment per student and reflecting in school income")
-                students = conn.execute(text("SELECT student_id FROM ss_t_student")).fetchall()
-                payment_rows = []
-                income_rows = []
-                for s in students:
-                    payment_rows.append({"student_id": s.student_id, "fee_structure_id": 1, "amount_paid": 500.0, "payment_date": datetime.today().date(), "payment_method": "Offline"})
-                conn.execute(text("""INSERT INTO ss_t_fee_payment_installment (student_id, fee_structure_id, amount_paid, payment_date, payment_method, created_at, updated_at)
-                                     VALUES (:student_id, :fee_structure_id, :amount_paid, :payment_date, :payment_method, NOW(), NOW())"""), payment_rows)
-                payments = conn.execute(text("SELECT fee_payment_id FROM ss_t_fee_payment_installment ORDER BY fee_payment_id DESC LIMIT :n"), {"n": len(payment_rows)}).fetchall()
-                for p in payments:
-                    income_rows.append({"fee_payment_id": p.fee_payment_id})
-                if income_rows:
-                    conn.execute(text("""INSERT INTO ss_t_school_income (fee_payment_id, created_at, updated_at) VALUES (:fee_payment_id, NOW(), NOW())"""), income_rows)
-                    logging.info(f"Inserted {len(income_rows)} school income rows")
+                n_income = 0
+                for student_ids in iter_ids(conn, "ss_t_student", "student_id"):
+                    payment_rows = []
+                    for student_id in student_ids:
+                        payment_rows.append({"student_id": student_id, "fee_structure_id": 1, "amount_paid": 500.0, "payment_date": today, "payment_method": "Offline"})
+                    # ids come back from the INSERT itself, no re-select of the newest rows
+                    payment_ids = insert_returning_ids(conn, "ss_t_fee_payment_installment", payment_rows, "fee_payment_id")
+                    income_rows = [{"fee_payment_id": p} for p in payment_ids]
+                    n_income += insert_records(conn, "ss_t_school_income", income_rows)
+                if n_income:
+                    logging.info(f"Inserted {n_income} school income rows")
 
             # TEACHER SALARY STRUCTURE and PAYSLIPS
-            if df_teacher_salary is not None:
-                inserted = insert_table_from_df(conn, df_teacher_salary, "ss_t_teacher_salary_structure")
+            if "ss_t_teacher_salary_structure" in deferred:
+                logging.info("Deferred ss_t_teacher_salary_structure to the parallel leaf load")
+            elif sheet_teacher_salary is not None:
+                inserted = insert_rows(conn, sheet_teacher_salary, "ss_t_teacher_salary_structure")
                 logging.info(f"Inserted {inserted} salary structures")
-            if df_payslips is not None:
-                inserted = insert_table_from_df(conn, df_payslips, "ss_t_teacher_salary_payslip")
+            if "ss_t_teacher_salary_payslip" in deferred:
+                logging.info("Deferred ss_t_teacher_salary_payslip to the parallel leaf load")
+            elif sheet_payslips is not None:
+                inserted = insert_rows(conn, sheet_payslips, "ss_t_teacher_salary_payslip")
                 logging.info(f"Inserted {inserted} payslips")
             else:
                 logging.info("No teacher_payslips.xlsx — creating payslips for June & July for each teacher")
-                teachers = conn.execute(text("SELECT teacher_id FROM ss_t_teacher")).fetchall()
-                pays = []
-                for t in teachers:
-                    pays.append({"teacher_id": t.teacher_id, "month_year":"2025-06", "gross_salary":35000.0, "deductions":2000.0, "net_salary":33000.0})
-                    pays.append({"teacher_id": t.teacher_id, "month_year":"2025-07", "gross_salary":35000.0, "deductions":2000.0, "net_salary":33000.0})
-                conn.execute(text("""INSERT INTO ss_t_teacher_salary_payslip (teacher_id, month_year, gross_salary, deductions, net_salary, created_at, updated_at)
-                                     VALUES (:teacher_id, :month_year, :gross_salary, :deductions, :net_salary, NOW(), NOW())"""), pays)
-                logging.info(f"Inserted {len(pays)} payslips")
+                auto_rows.append(("ss_t_teacher_salary_payslip", build_payslip_rows(teachers), "payslips"))
+
+            # auto-generated rows were built above without touching the DB; issue them back to back
+            inserted = [insert_records(conn, table_name, rows) for table_name, rows, _ in auto_rows]
+            for n, (_, _, label) in zip(inserted, auto_rows):
+                logging.info(f"Inserted {n} {label}")
 
+        if deferred:
+            logging.info("Main transaction committed — loading leaf sheets in parallel.")
+            load_leaf_sheets(deferred)
+            logging.info("Data load completed successfully (leaf sheets in their own transactions).")
+        else:
             logging.info("Data load completed successfully within a transaction.")
 
     except SQLAlchemyError as e: